@@ -7,6 +7,15 @@ import sys
 from pathlib import Path
 
 from . import read, write, to_markdown, from_markdown
+from .markdown import _INDENTS
+from .models import TaskStatus
+
+# --status choices for the tasks command
+_STATUS_MAP = {
+    "open": TaskStatus.NOT_STARTED,
+    "done": TaskStatus.COMPLETE,
+    "in-progress": TaskStatus.IN_PROGRESS,
+}
 
 
 def main():
@@ -40,7 +49,7 @@ def main():
     # --- tasks ---
     p_tasks = sub.add_parser("tasks", help="List all tasks")
     p_tasks.add_argument("file", help="Path to .mmap file")
-    p_tasks.add_argument("--status", choices=["open", "done", "in-progress"], help="Filter by status")
+    p_tasks.add_argument("--status", choices=list(_STATUS_MAP), help="Filter by status")
     
     args = parser.parse_args()
     
@@ -58,35 +67,48 @@ def main():
 
 def cmd_info(args):
     m = read(args.file)
+    # Preorder topics with subtree sizes; branches past --depth are skipped whole
+    flat = m._flat_tree()
+    topics, sizes = flat.topics, flat.subtree_size
+    
     print(f"File: {args.file}")
     print(f"Title: {m.root.text}")
-    print(f"Topics: {m.topic_count}")
-    print(f"Tasks: {sum(1 for _ in m.tasks())}")
+    print(f"Topics: {len(topics)}")
+    print(f"Tasks: {sum(1 for t in topics if t.task is not None)}")
     print()
     
-    def show(topic, depth=0, max_depth=2):
-        if depth > max_depth:
-            return
-        child_count = len(topic.children)
-        desc_count = topic.count() - 1
+    out = []
+    i = 1
+    while i < len(topics):
+        topic = topics[i]
+        depth = topic.depth - 1
+        if depth > args.depth:
+            i += sizes[i]
+            continue
+        desc_count = sizes[i] - 1
         suffix = f" ({desc_count} items)" if desc_count > 0 else ""
         task_mark = " ✓" if topic.task and topic.task.percentage >= 100 else ""
         task_mark = " ◔" if topic.task and 0 < topic.task.percentage < 100 else task_mark
-        print("  " * depth + f"• {topic.text}{suffix}{task_mark}")
-        for child in topic.children:
-            show(child, depth + 1, max_depth)
+        indent = _INDENTS[depth] if depth < len(_INDENTS) else "  " * depth
+        out.append(f"{indent}• {topic.text}{suffix}{task_mark}")
+        i += 1
     
-    for child in m.root.children:
-        show(child, 0, args.depth)
+    _write_lines(out)
 
 
 def cmd_tree(args):
     m = read(args.file)
+    out = []
     
-    for topic in m.walk():
+    # Depth-first like m.walk(), with each topic's depth carried on the stack
+    # rather than recounted from the parent chain
+    stack = [(m.root, 0)]
+    while stack:
+        topic, depth = stack.pop()
+        stack.extend((child, depth + 1) for child in reversed(topic.children))
         if args.tasks_only and topic.task is None:
             continue
-        indent = "  " * topic.depth
+        indent = _INDENTS[depth] if depth < len(_INDENTS) else "  " * depth
         task_info = ""
         if topic.task:
             t = topic.task
@@ -99,7 +121,9 @@ def cmd_tree(args):
                 parts.append(f"📅 {t.due_date.strftime('%Y-%m-%d')}")
             if parts:
                 task_info = f" [{' '.join(parts)}]"
-        print(f"{indent}{topic.text}{task_info}")
+        out.append(f"{indent}{topic.text}{task_info}")
+    
+    _write_lines(out)
 
 
 def cmd_export(args):
@@ -115,36 +139,39 @@ def cmd_export(args):
 
 def cmd_find(args):
     m = read(args.file)
-    query = args.query.lower()
+    query = args.query.casefold()
+    out = []
     
-    for topic in m.walk():
-        if query in topic.text.lower():
-            path = " → ".join(topic.path)
+    for topic, path in m.root.walk_with_path():
+        if query in topic._folded_text():
+            path = " → ".join(path)
             task_info = ""
             if topic.task:
                 task_info = f" [{topic.task.percentage}%]"
-            print(f"{path}{task_info}")
+            out.append(f"{path}{task_info}")
+    
+    _write_lines(out)
 
 
 def cmd_tasks(args):
-    from .models import TaskStatus
-    
     m = read(args.file)
+    status_filter = _STATUS_MAP.get(args.status)
     
-    status_filter = None
-    if args.status == "open":
-        status_filter = TaskStatus.NOT_STARTED
-    elif args.status == "done":
-        status_filter = TaskStatus.COMPLETE
-    elif args.status == "in-progress":
-        status_filter = TaskStatus.IN_PROGRESS
-    
+    out = []
     for topic in m.tasks(status=status_filter):
         t = topic.task
         status = "✅" if t.percentage >= 100 else f"{t.percentage}%"
         due = f" 📅 {t.due_date.strftime('%Y-%m-%d')}" if t.due_date else ""
         path = " → ".join(topic.path[-3:])  # Last 3 levels for readability
-        print(f"[{status}] {path}{due}")
+        out.append(f"[{status}] {path}{due}")
+    
+    _write_lines(out)
+
+
+def _write_lines(lines: list[str]) -> None:
+    """Write output lines to stdout in a single call instead of a print per line."""
+    if lines:
+        sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
@@ -10,10 +10,12 @@ Markdown format uses:
 from __future__ import annotations
 
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from typing import Optional
 
 from .models import (
+    Hyperlink,
     MindMap,
     Task,
     TaskPriority,
@@ -21,13 +23,44 @@ from .models import (
     Topic,
 )
 
+# Indent prefixes by depth, shared with the CLI; deeper topics fall back to
+# building the string
+_INDENTS = tuple("  " * depth for depth in range(128))
 
-def to_markdown(mindmap: MindMap, *, include_frontmatter: bool = True) -> str:
+# Maps smaller than this are always rendered in-process; worker start-up
+# would cost more than it saves
+_PARALLEL_MIN_TOPICS = 1000
+
+# Task metadata and hyperlinks in a list item, matched in a single scan
+_META_RE = re.compile(
+    r"(?P<due>📅\s*(?P<due_date>\d{4}-\d{2}-\d{2}))"
+    r"|(?P<pct>\((?P<percent>\d+)%\))"
+    r"|(?P<link>\[🔗\]\((?P<url>[^)]+)\))"
+)
+
+# Obsidian Tasks checkbox and priority markers
+_CHECKBOXES = {TaskStatus.COMPLETE: "[x] "}
+_PRI_EMOJI = {
+    TaskPriority.HIGH: "⏫",
+    TaskPriority.MEDIUM: "🔼",
+    TaskPriority.LOW: "🔽",
+}
+
+
+def to_markdown(
+    mindmap: MindMap,
+    *,
+    include_frontmatter: bool = True,
+    workers: Optional[int] = None,
+) -> str:
     """Export a MindMap to Obsidian-compatible markdown.
     
     Args:
         mindmap: The map to export.
         include_frontmatter: Whether to include YAML frontmatter.
+        workers: Render top-level branches in up to this many worker
+            processes. Only used for maps of more than 1000 topics; by
+            default everything is rendered in this process.
         
     Returns:
         Markdown string.
@@ -47,22 +80,54 @@ def to_markdown(mindmap: MindMap, *, include_frontmatter: bool = True) -> str:
     lines.append(f"# {mindmap.root.text}")
     lines.append("")
     
-    # Each top-level child becomes an H2
-    for branch in mindmap.root.children:
-        lines.append(f"## {branch.text}")
-        lines.append("")
-        
-        for child in branch.children:
-            _topic_to_md(child, lines, depth=0)
-        
-        lines.append("")
+    # Each top-level child becomes an H2 section, rendered independently
+    branches = mindmap.root.children
+    if (
+        workers is not None
+        and workers > 1
+        and len(branches) > 1
+        and mindmap.topic_count > _PARALLEL_MIN_TOPICS
+    ):
+        # Workers receive the tree once, at start-up, and are then sent only
+        # branch indices; pickling a branch per task would drag the whole
+        # map along through its parent links.
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(branches)),
+            initializer=_init_render_worker,
+            initargs=(mindmap.root,),
+        ) as pool:
+            lines.extend(pool.map(_render_branch_at, range(len(branches))))
+    else:
+        lines.extend(_render_branch(branch) for branch in branches)
     
     return "\n".join(lines)
 
 
+def _render_branch(branch: Topic) -> str:
+    """Render a top-level branch as an H2 section."""
+    lines = [f"## {branch.text}", ""]
+    for child in branch.children:
+        _topic_to_md(child, lines, depth=0)
+    lines.append("")
+    return "\n".join(lines)
+
+
+# Root of the map being exported, in a to_markdown worker process
+_worker_root: Optional[Topic] = None
+
+
+def _init_render_worker(root: Topic) -> None:
+    global _worker_root
+    _worker_root = root
+
+
+def _render_branch_at(index: int) -> str:
+    return _render_branch(_worker_root.children[index])
+
+
 def _topic_to_md(topic: Topic, lines: list[str], depth: int) -> None:
     """Recursively render a topic as a markdown list item."""
-    indent = "  " * depth
+    indent = _INDENTS[depth] if depth < len(_INDENTS) else "  " * depth
     
     # Build the line
     checkbox = ""
@@ -70,21 +135,15 @@ def _topic_to_md(topic: Topic, lines: list[str], depth: int) -> None:
     
     if topic.task is not None:
         t = topic.task
-        if t.status == TaskStatus.COMPLETE:
-            checkbox = "[x] "
-        else:
-            checkbox = "[ ] "
+        checkbox = _CHECKBOXES.get(t.status, "[ ] ")
         
         meta_parts = []
-        if t.priority == TaskPriority.HIGH:
-            meta_parts.append("⏫")
-        elif t.priority == TaskPriority.MEDIUM:
-            meta_parts.append("🔼")
-        elif t.priority == TaskPriority.LOW:
-            meta_parts.append("🔽")
+        pri_emoji = _PRI_EMOJI.get(t.priority)
+        if pri_emoji:
+            meta_parts.append(pri_emoji)
         
         if t.due_date:
-            meta_parts.append(f"📅 {t.due_date.strftime('%Y-%m-%d')}")
+            meta_parts.append("📅 " + t.due_date.strftime("%Y-%m-%d"))
         
         if t.percentage > 0 and t.percentage < 100:
             meta_parts.append(f"({t.percentage}%)")
@@ -95,16 +154,14 @@ def _topic_to_md(topic: Topic, lines: list[str], depth: int) -> None:
     # Hyperlinks
     link_text = ""
     if topic.hyperlinks:
-        links = [f"[🔗]({hl.url})" for hl in topic.hyperlinks]
-        link_text = " " + " ".join(links)
+        link_text = "".join([" [🔗](" + hl.url + ")" for hl in topic.hyperlinks])
     
-    line = f"{indent}- {checkbox}{topic.text}{task_meta}{link_text}"
-    lines.append(line)
+    lines.append("".join((indent, "- ", checkbox, topic.text, task_meta, link_text)))
     
     # Notes as blockquote
     if topic.note and topic.note.plain_text:
-        for note_line in topic.note.plain_text.split("\n"):
-            lines.append(f"{indent}  > {note_line}")
+        quote = indent + "  > "
+        lines.extend([quote + note_line for note_line in topic.note.plain_text.split("\n")])
     
     # Children
     for child in topic.children:
@@ -165,8 +222,10 @@ def from_markdown(text: str) -> MindMap:
                 i += 1
                 continue
             
-            # Calculate indent level
-            indent = len(line) - len(line.lstrip())
+            # Calculate indent level. The first non-blank character is the
+            # "-" marker, so finding it measures the leading whitespace
+            # without allocating a stripped copy of the line.
+            indent = line.find("-")
             indent_level = indent // 2
             
             # Parse the list item
@@ -217,29 +276,42 @@ def _parse_md_item(text: str) -> Topic:
             task.priority = TaskPriority.LOW
             text = text.replace("🔽", "").strip()
         
-        # Due date
-        due_match = re.search(r"📅\s*(\d{4}-\d{2}-\d{2})", text)
-        if due_match:
+        topic.task = task
+    
+    # Due date, percentage and hyperlinks, in one pass. Removed task metadata
+    # also takes the whitespace around it; hyperlinks are cut out as-is.
+    kept = []
+    pos = 0
+    strip_next = False
+    due_seen = pct_seen = False
+    for match in _META_RE.finditer(text):
+        kind = match.lastgroup
+        if kind == "link":
+            topic.hyperlinks.append(Hyperlink(url=match["url"]))
+        elif task is None:
+            continue
+        elif kind == "due" and not due_seen:
+            due_seen = True
             try:
-                task.due_date = datetime.strptime(due_match.group(1), "%Y-%m-%d")
+                task.due_date = datetime.strptime(match["due_date"], "%Y-%m-%d")
             except ValueError:
                 pass
-            text = text[:due_match.start()].strip() + text[due_match.end():].strip()
-        
-        # Percentage
-        pct_match = re.search(r"\((\d+)%\)", text)
-        if pct_match and task.percentage < 100:
-            task.percentage = int(pct_match.group(1))
-            text = text[:pct_match.start()].strip() + text[pct_match.end():].strip()
+        elif kind == "pct" and not pct_seen and task.percentage < 100:
+            pct_seen = True
+            task.percentage = int(match["percent"])
+        else:
+            continue
         
-        topic.task = task
+        segment = text[pos:match.start()]
+        if strip_next:
+            segment = segment.lstrip()
+        strip_next = kind != "link"
+        kept.append(segment.rstrip() if strip_next else segment)
+        pos = match.end()
     
-    # Extract hyperlinks [🔗](url)
-    link_pattern = re.compile(r"\[🔗\]\(([^)]+)\)")
-    for match in link_pattern.finditer(text):
-        from .models import Hyperlink
-        topic.hyperlinks.append(Hyperlink(url=match.group(1)))
-    text = link_pattern.sub("", text).strip()
+    tail = text[pos:]
+    kept.append(tail.lstrip() if strip_next else tail)
+    text = "".join(kept)
     
     topic.text = text.strip()
     return topic
@@ -2,10 +2,12 @@
 
 from __future__ import annotations
 
+import re
+from array import array
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Callable, ClassVar, Iterable, Optional, Union
 
 
 class TaskPriority(Enum):
@@ -23,55 +25,71 @@ class TaskStatus(Enum):
     COMPLETE = "complete"
 
 
-@dataclass
+@dataclass(slots=True)
 class IconMarker:
     """An icon/marker attached to a topic."""
     icon_type: str = ""
     icon_signature: str = ""
     
     # Well-known icon types
-    PRIORITY_1 = "urn:mindjet:Priority1"
-    PRIORITY_2 = "urn:mindjet:Priority2"
-    PRIORITY_3 = "urn:mindjet:Priority3"
-    FLAG = "urn:mindjet:Flag"
-    STAR = "urn:mindjet:Star"
-    TICK_GREEN = "urn:mindjet:TickGreen"
-    TICK_YELLOW = "urn:mindjet:TickYellow"
-    CROSS_RED = "urn:mindjet:CrossRed"
+    PRIORITY_1: ClassVar[str] = "urn:mindjet:Priority1"
+    PRIORITY_2: ClassVar[str] = "urn:mindjet:Priority2"
+    PRIORITY_3: ClassVar[str] = "urn:mindjet:Priority3"
+    FLAG: ClassVar[str] = "urn:mindjet:Flag"
+    STAR: ClassVar[str] = "urn:mindjet:Star"
+    TICK_GREEN: ClassVar[str] = "urn:mindjet:TickGreen"
+    TICK_YELLOW: ClassVar[str] = "urn:mindjet:TickYellow"
+    CROSS_RED: ClassVar[str] = "urn:mindjet:CrossRed"
 
 
-@dataclass
+@dataclass(slots=True)
 class Task:
     """Task metadata attached to a topic."""
     percentage: int = 0  # 0-100
     priority: TaskPriority = TaskPriority.NONE
     due_date: Optional[datetime] = None
     start_date: Optional[datetime] = None
+    # Derived from percentage, stored so reads are a plain attribute lookup
+    status: TaskStatus = field(init=False, compare=False)
     
-    @property
-    def status(self) -> TaskStatus:
-        if self.percentage >= 100:
-            return TaskStatus.COMPLETE
-        elif self.percentage > 0:
-            return TaskStatus.IN_PROGRESS
-        return TaskStatus.NOT_STARTED
+    def __setattr__(self, name: str, value) -> None:
+        if name == "status":
+            raise AttributeError("Task.status is derived from percentage; set percentage instead")
+        object.__setattr__(self, name, value)
+        if name == "percentage":
+            object.__setattr__(self, "status", _status_for(value))
+    
+    # Copies and pickles carry the fields only; status is derived again
+    def __getstate__(self):
+        return (self.percentage, self.priority, self.due_date, self.start_date)
+    
+    def __setstate__(self, state) -> None:
+        self.percentage, self.priority, self.due_date, self.start_date = state
+
 
+def _status_for(percentage: int) -> TaskStatus:
+    if percentage >= 100:
+        return TaskStatus.COMPLETE
+    elif percentage > 0:
+        return TaskStatus.IN_PROGRESS
+    return TaskStatus.NOT_STARTED
 
-@dataclass
+
+@dataclass(slots=True)
 class Hyperlink:
     """A hyperlink attached to a topic."""
     url: str = ""
     text: str = ""
 
 
-@dataclass  
+@dataclass(slots=True)
 class Note:
     """Rich text note attached to a topic."""
     plain_text: str = ""
     html: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Topic:
     """A single topic node in a mind map.
     
@@ -92,10 +110,37 @@ class Topic:
     hyperlinks: list[Hyperlink] = field(default_factory=list)
     note: Optional[Note] = None
     
-    # Style (preserved for round-trip fidelity)
-    _style_xml: Optional[str] = field(default=None, repr=False)
+    # Style (preserved for round-trip fidelity). Readers may supply a callable
+    # that renders it, so the XML is only serialized if someone asks for it.
+    _style_src: Optional[Callable[[], str]] = field(default=None, repr=False, compare=False)
+    _style_xml_text: Optional[str] = field(default=None, repr=False, compare=False)
     # Raw XML element (for preserving unknown attributes)
     _raw_attribs: dict = field(default_factory=dict, repr=False)
+    # Casefolded `text` for searching, and the text it was computed from
+    _text_cf: str = field(default="", init=False, repr=False, compare=False)
+    _text_cf_src: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def _style_xml(self) -> Optional[str]:
+        if self._style_src is not None:
+            self._style_xml_text = self._style_src()
+            self._style_src = None
+        return self._style_xml_text
+    
+    @_style_xml.setter
+    def _style_xml(self, value: Optional[str]) -> None:
+        self._style_xml_text = value
+        self._style_src = None
+    
+    def __getstate__(self) -> dict:
+        # The style callable may close over a parser element, which can't be
+        # pickled (e.g. for to_markdown workers), so render it first
+        self._style_xml
+        return {name: getattr(self, name) for name in self.__slots__}
+    
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
     
     @property
     def depth(self) -> int:
@@ -123,30 +168,48 @@ class Topic:
     
     def find(self, text: str) -> Optional[Topic]:
         """Find first descendant with matching text (case-insensitive)."""
-        text_lower = text.lower()
-        if self.text.lower() == text_lower:
-            return self
-        for child in self.children:
-            result = child.find(text)
-            if result is not None:
-                return result
+        needle = text.casefold()
+        for topic in self.walk():
+            if topic._folded_text() == needle:
+                return topic
         return None
     
     def find_all(self, text: str) -> list[Topic]:
         """Find all descendants with matching text (case-insensitive)."""
-        results = []
-        text_lower = text.lower()
-        if self.text.lower() == text_lower:
-            results.append(self)
-        for child in self.children:
-            results.extend(child.find_all(text))
-        return results
+        needle = text.casefold()
+        return [topic for topic in self.walk() if topic._folded_text() == needle]
+    
+    def find_regex(self, pattern: Union[str, re.Pattern]) -> list[Topic]:
+        """Find all descendants whose text matches a regular expression.
+        
+        String patterns are compiled case-insensitively; pass a compiled
+        pattern to control the flags.
+        """
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern, re.IGNORECASE)
+        search = pattern.search
+        return [topic for topic in self.walk() if search(topic.text)]
     
     def walk(self):
         """Yield this topic and all descendants depth-first."""
-        yield self
-        for child in self.children:
-            yield from child.walk()
+        stack = [self]
+        while stack:
+            topic = stack.pop()
+            yield topic
+            stack.extend(reversed(topic.children))
+    
+    def walk_with_path(self):
+        """Yield (topic, path) pairs depth-first.
+        
+        Like `walk()`, but each topic comes with the tuple of texts from the
+        root down to it, extended per level instead of rebuilt per topic.
+        """
+        stack = [(self, tuple(self.path[:-1]))]
+        while stack:
+            topic, prefix = stack.pop()
+            path = prefix + (topic.text,)
+            yield topic, path
+            stack.extend((child, path) for child in reversed(topic.children))
     
     def add_child(self, text: str, **kwargs) -> Topic:
         """Create and append a new child topic."""
@@ -155,17 +218,55 @@ class Topic:
         return child
     
     def remove(self) -> None:
-        """Remove this topic from its parent's children list."""
+        """Remove this topic from its parent's children list.
+        
+        The list is edited in place, so removing children while iterating
+        over `parent.children` skips the sibling after each removal. Iterate
+        over a copy, or collect the topics and call `parent.remove_many()`.
+        """
         if self.parent is not None:
-            self.parent.children = [c for c in self.parent.children if c is not self]
-            self.parent = None
+            self._detach()
+    
+    def remove_many(self, children: Iterable[Topic]) -> None:
+        """Remove several of this topic's children in one pass over the list.
+        
+        Topics that aren't children of this topic are ignored.
+        """
+        doomed = {id(child) for child in children if child.parent is self}
+        if not doomed:
+            return
+        kept = []
+        for child in self.children:
+            if id(child) in doomed:
+                child.parent = None
+            else:
+                kept.append(child)
+        self.children[:] = kept
     
     def move_to(self, new_parent: Topic) -> None:
         """Move this topic to a new parent."""
-        self.remove()
+        if self.parent is not None:
+            self._detach()
         self.parent = new_parent
         new_parent.children.append(self)
     
+    def _folded_text(self) -> str:
+        """Casefolded text, cached until `text` is reassigned."""
+        if self._text_cf_src is not self.text:
+            self._text_cf = self.text.casefold()
+            self._text_cf_src = self.text
+        return self._text_cf
+    
+    def _detach(self) -> None:
+        # Matched by identity: dataclass equality would treat look-alike
+        # siblings as the same topic
+        siblings = self.parent.children
+        for i, sibling in enumerate(siblings):
+            if sibling is self:
+                del siblings[i]
+                break
+        self.parent = None
+    
     def count(self) -> int:
         """Total number of descendants (including self)."""
         return sum(1 for _ in self.walk())
@@ -179,7 +280,7 @@ class Topic:
         return f"Topic({self.text!r}{suffix})"
 
 
-@dataclass
+@dataclass(slots=True)
 class MindMap:
     """A complete MindManager mind map.
     
@@ -199,6 +300,8 @@ class MindMap:
     
     @property
     def topic_count(self) -> int:
+        # Counted on each access: topics and children lists are plain public
+        # fields, so nothing could tell a cached count that it went stale
         return self.root.count()
     
     def find(self, text: str) -> Optional[Topic]:
@@ -209,16 +312,54 @@ class MindMap:
         """Find all topics with matching text."""
         return self.root.find_all(text)
     
+    def find_regex(self, pattern: Union[str, re.Pattern]) -> list[Topic]:
+        """Find all topics whose text matches a regular expression."""
+        return self.root.find_regex(pattern)
+    
     def walk(self):
         """Iterate all topics depth-first."""
         yield from self.root.walk()
     
     def tasks(self, status: Optional[TaskStatus] = None):
-        """Yield all topics that have task metadata, optionally filtered by status."""
-        for topic in self.walk():
-            if topic.task is not None:
-                if status is None or topic.task.status == status:
-                    yield topic
+        """Iterate all topics that have task metadata, optionally filtered by status."""
+        # One pass over the live tree per call. A per-status index can't be
+        # kept across calls: topic.task and children lists are plain fields,
+        # so edits to them would go unnoticed.
+        for topic in self.root.walk():
+            task = topic.task
+            if task is not None and (status is None or task.status is status):
+                yield topic
+    
+    def _flat_tree(self) -> _FlatTree:
+        """Preorder snapshot of the current tree, built fresh on each call."""
+        return _FlatTree(self.root)
     
     def __repr__(self) -> str:
         return f"MindMap({self.root.text!r}, {self.topic_count} topics)"
+
+
+class _FlatTree:
+    """Preorder snapshot of a topic tree, for read-only scans.
+    
+    Topics are stored in a flat list in `walk()` order, with parallel arrays
+    of parent indices and subtree sizes. A topic's subtree is therefore the
+    contiguous slice `topics[i:i + subtree_size[i]]`. The snapshot does not
+    follow later edits to the tree; build a new one instead of keeping it.
+    """
+    __slots__ = ("root", "topics", "parent", "subtree_size")
+    
+    def __init__(self, root: Topic) -> None:
+        self.root = root
+        self.topics = topics = list(root.walk())
+        
+        n = len(topics)
+        index = {id(topic): i for i, topic in enumerate(topics)}
+        self.parent = parent = array("i", [-1]) * n
+        for i, topic in enumerate(topics):
+            for child in topic.children:
+                parent[index[id(child)]] = i
+        
+        self.subtree_size = size = array("i", [1]) * n
+        for i in range(n - 1, 0, -1):
+            size[parent[i]] += size[i]
+
@@ -2,12 +2,21 @@
 
 from __future__ import annotations
 
-import xml.etree.ElementTree as ET
 import zipfile
 from datetime import datetime
+from functools import partial
 from pathlib import Path
 from typing import Union
 
+try:
+    from lxml import etree as ET
+    # Lift libxml2's default nesting limit; deep maps are legitimate input.
+    # Entities are left unexpanded, so a DTD can't pull in local files.
+    _ITERPARSE_OPTIONS = {"huge_tree": True, "resolve_entities": False}
+except ImportError:  # lxml is optional; the stdlib parser is the fallback
+    import xml.etree.ElementTree as ET
+    _ITERPARSE_OPTIONS = {}
+
 from .models import (
     Hyperlink,
     IconMarker,
@@ -21,6 +30,21 @@ from .models import (
 NS = "http://schemas.mindjet.com/MindManager/Application/2003"
 _NS = f"{{{NS}}}"
 
+# Namespace-qualified tags, built once rather than per topic
+_TAG_ONETOPIC = f"{_NS}OneTopic"
+_TAG_TOPIC = f"{_NS}Topic"
+_TAG_TEXT = f"{_NS}Text"
+_TAG_TASK = f"{_NS}Task"
+_TAG_ICONMARKERS = f"{_NS}IconMarkers"
+_TAG_ICONMARKER = f"{_NS}IconMarker"
+_TAG_HYPERLINK = f"{_NS}Hyperlink"
+_TAG_HYPERLINKGROUP = f"{_NS}HyperlinkGroup"
+_TAG_NOTESGROUP = f"{_NS}NotesGroup"
+_TAG_NOTES = f"{_NS}Notes"
+_TAG_HTML = f"{_NS}Html"
+_TAG_SUBTOPICSHAPE = f"{_NS}SubTopicShape"
+_TAG_SUBTOPICS = f"{_NS}SubTopics"
+
 
 def read(path: Union[str, Path]) -> MindMap:
     """Read a .mmap file and return a MindMap object.
@@ -40,112 +64,143 @@ def read(path: Union[str, Path]) -> MindMap:
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
     
-    # Extract Document.xml from the ZIP container
+    # Stream Document.xml out of the ZIP container straight into the parser
     with zipfile.ZipFile(path, "r") as zf:
         if "Document.xml" not in zf.namelist():
             raise ValueError(f"No Document.xml found in {path}")
-        xml_bytes = zf.read("Document.xml")
-    
-    # Parse XML
-    root_elem = ET.fromstring(xml_bytes)
-    
-    # Find the central topic
-    one_topic = root_elem.find(f".//{_NS}OneTopic")
-    if one_topic is None:
-        raise ValueError("No OneTopic element found in Document.xml")
-    
-    topic_elem = one_topic.find(f"{_NS}Topic")
-    if topic_elem is None:
-        raise ValueError("No root Topic found under OneTopic")
+        with zf.open("Document.xml") as fp:
+            root = _parse_tree(fp)
     
     # Build the map
     mindmap = MindMap()
     mindmap._source_path = str(path)
     mindmap._xml_namespace = NS
-    mindmap.root = _parse_topic(topic_elem, parent=None)
+    mindmap.root = root
     mindmap.title = mindmap.root.text
     
     return mindmap
 
 
-def _parse_topic(elem: ET.Element, parent: Topic | None) -> Topic:
-    """Recursively parse a Topic XML element into a Topic object."""
-    topic = Topic()
-    topic.parent = parent
-    
-    # OId attribute
-    topic.oid = elem.get("OId", "")
-    
-    # Preserve raw attributes for round-trip
-    topic._raw_attribs = dict(elem.attrib)
-    
-    # Text
-    text_elem = elem.find(f"{_NS}Text")
-    if text_elem is not None:
-        topic.text = text_elem.get("PlainText", "")
+def _parse_tree(source) -> Topic:
+    """Stream Document.xml and build the central topic tree in a single pass.
     
-    # Task info
-    task_elem = elem.find(f"{_NS}Task")
-    if task_elem is not None:
-        topic.task = _parse_task(task_elem)
-    
-    # Icon markers
-    icons_elem = elem.find(f"{_NS}IconMarkers")
-    if icons_elem is not None:
-        for icon_elem in icons_elem:
-            if icon_elem.tag == f"{_NS}IconMarker":
-                marker = IconMarker(
-                    icon_type=icon_elem.get("IconType", ""),
-                    icon_signature=icon_elem.get("IconSignature", ""),
-                )
-                topic.icons.append(marker)
-    
-    # Hyperlinks
-    hyperlinks_elem = elem.find(f"{_NS}Hyperlink")
-    if hyperlinks_elem is not None:
-        hl = Hyperlink(
-            url=hyperlinks_elem.get("Url", ""),
-            text=hyperlinks_elem.get("Text", ""),
-        )
-        topic.hyperlinks.append(hl)
-    
-    # Multiple hyperlinks via HyperlinkGroup
-    hl_group = elem.find(f"{_NS}HyperlinkGroup")
-    if hl_group is not None:
-        for hl_elem in hl_group:
-            if hl_elem.tag == f"{_NS}Hyperlink":
-                hl = Hyperlink(
-                    url=hl_elem.get("Url", ""),
-                    text=hl_elem.get("Text", ""),
-                )
-                topic.hyperlinks.append(hl)
-    
-    # Notes
-    notes_group = elem.find(f"{_NS}NotesGroup")
-    if notes_group is not None:
-        notes_elem = notes_group.find(f"{_NS}Notes")
-        if notes_elem is not None:
-            plain = notes_elem.get("PlainText", "")
-            html_content = ""
-            html_elem = notes_elem.find(f"{_NS}Html")
-            if html_elem is not None and html_elem.text:
-                html_content = html_elem.text
-            topic.note = Note(plain_text=plain, html=html_content)
-    
-    # Style XML (preserve for round-trip)
-    style_elem = elem.find(f"{_NS}SubTopicShape")
-    if style_elem is not None:
-        topic._style_xml = ET.tostring(style_elem, encoding="unicode")
+    Topic objects are created when their element opens and filled in as each
+    direct child element closes. Finished Topic elements are cleared, so the
+    parsed XML never holds the whole map at once and no recursion is needed.
+    """
+    one_topic = None
+    root = None
+    open_elems: list[ET.Element] = []  # ancestors of the current element
+    open_topics: list[tuple[ET.Element, Topic]] = []
     
-    # Recurse into children
-    subtopics_elem = elem.find(f"{_NS}SubTopics")
-    if subtopics_elem is not None:
-        for child_elem in subtopics_elem:
-            if child_elem.tag == f"{_NS}Topic":
-                child = _parse_topic(child_elem, parent=topic)
-                topic.children.append(child)
+    for event, elem in ET.iterparse(
+        source, events=("start", "end"), **_ITERPARSE_OPTIONS
+    ):
+        if event == "start":
+            if elem.tag == _TAG_TOPIC and open_elems:
+                parent_elem = open_elems[-1]
+                topic = None
+                if parent_elem is one_topic and root is None:
+                    topic = root = Topic()
+                elif (
+                    open_topics
+                    and parent_elem.tag == _TAG_SUBTOPICS
+                    and open_elems[-2] is open_topics[-1][0]
+                ):
+                    parent = open_topics[-1][1]
+                    topic = Topic(parent=parent)
+                    parent.children.append(topic)
+                
+                if topic is not None:
+                    topic.oid = elem.get("OId", "")
+                    # Preserve raw attributes for round-trip
+                    topic._raw_attribs = dict(elem.attrib)
+                    open_topics.append((elem, topic))
+            elif elem.tag == _TAG_ONETOPIC and one_topic is None:
+                one_topic = elem
+            open_elems.append(elem)
+            continue
+        
+        open_elems.pop()
+        if not open_topics:
+            continue
+        topic_elem, topic = open_topics[-1]
+        if elem is topic_elem:
+            open_topics.pop()
+            elem.clear()
+        elif open_elems[-1] is topic_elem:
+            handler = _TOPIC_CHILD_HANDLERS.get(elem.tag)
+            if handler is not None:
+                handler(topic, elem)
     
-    return topic
+    if one_topic is None:
+        raise ValueError("No OneTopic element found in Document.xml")
+    if root is None:
+        raise ValueError("No root Topic found under OneTopic")
+    return root
+
+
+# Handlers for a Topic's direct child elements, each called once the child
+# element is complete.
+
+def _set_text(topic: Topic, elem: ET.Element) -> None:
+    topic.text = elem.get("PlainText", "")
+
+
+def _set_task(topic: Topic, elem: ET.Element) -> None:
+    topic.task = _parse_task(elem)
+
+
+def _add_icons(topic: Topic, elem: ET.Element) -> None:
+    for icon_elem in elem:
+        if icon_elem.tag == _TAG_ICONMARKER:
+            marker = IconMarker(
+                icon_type=icon_elem.get("IconType", ""),
+                icon_signature=icon_elem.get("IconSignature", ""),
+            )
+            topic.icons.append(marker)
+
+
+def _add_hyperlink(topic: Topic, elem: ET.Element) -> None:
+    hl = Hyperlink(
+        url=elem.get("Url", ""),
+        text=elem.get("Text", ""),
+    )
+    topic.hyperlinks.append(hl)
+
+
+def _add_hyperlink_group(topic: Topic, elem: ET.Element) -> None:
+    """Multiple hyperlinks via HyperlinkGroup."""
+    for hl_elem in elem:
+        if hl_elem.tag == _TAG_HYPERLINK:
+            _add_hyperlink(topic, hl_elem)
+
+
+def _set_note(topic: Topic, elem: ET.Element) -> None:
+    notes_elem = elem.find(_TAG_NOTES)
+    if notes_elem is not None:
+        plain = notes_elem.get("PlainText", "")
+        html_content = ""
+        html_elem = notes_elem.find(_TAG_HTML)
+        if html_elem is not None and html_elem.text:
+            html_content = html_elem.text
+        topic.note = Note(plain_text=plain, html=html_content)
+
+
+def _set_style(topic: Topic, elem: ET.Element) -> None:
+    """Style XML (preserve for round-trip), serialized only when accessed."""
+    topic._style_src = partial(ET.tostring, elem, encoding="unicode")
+
+
+_TOPIC_CHILD_HANDLERS = {
+    _TAG_TEXT: _set_text,
+    _TAG_TASK: _set_task,
+    _TAG_ICONMARKERS: _add_icons,
+    _TAG_HYPERLINK: _add_hyperlink,
+    _TAG_HYPERLINKGROUP: _add_hyperlink_group,
+    _TAG_NOTESGROUP: _set_note,
+    _TAG_SUBTOPICSHAPE: _set_style,
+}
 
 
 def _parse_task(elem: ET.Element) -> Task:
@@ -182,6 +237,26 @@ def _parse_task(elem: ET.Element) -> Task:
 
 def _parse_date(date_str: str) -> datetime | None:
     """Parse MindManager date formats."""
+    # Fast paths for the ISO forms MindManager writes; strptime is slow. Every
+    # separator and digit is checked, so anything these accept strptime would
+    # parse the same way, and anything else falls through to it.
+    n = len(date_str)
+    if (n == 19 or n == 10) and date_str.isascii() and date_str[4] == "-" and date_str[7] == "-":
+        year, month, day = date_str[0:4], date_str[5:7], date_str[8:10]
+        try:
+            if n == 10:
+                if (year + month + day).isdigit():
+                    return datetime(int(year), int(month), int(day))
+            elif date_str[10] == "T" and date_str[13] == ":" and date_str[16] == ":":
+                hour, minute, second = date_str[11:13], date_str[14:16], date_str[17:19]
+                if (year + month + day + hour + minute + second).isdigit():
+                    return datetime(
+                        int(year), int(month), int(day),
+                        int(hour), int(minute), int(second),
+                    )
+        except ValueError:
+            pass
+    
     for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d", "%m/%d/%Y"):
         try:
             return datetime.strptime(date_str, fmt)
@@ -1,8 +1,13 @@
 """Core tests for mmap-tools."""
 
+import os
 import tempfile
+import uuid
+from datetime import datetime, timezone
 from pathlib import Path
 
+import pytest
+
 import mmap_tools
 from mmap_tools import MindMap, Topic, Task, TaskPriority, TaskStatus
 
@@ -40,6 +45,21 @@ def test_find():
     assert m.find("nonexistent") is None
 
 
+def test_find_after_rename_and_regex():
+    m = MindMap()
+    m.root.text = "Root"
+    a = m.root.add_child("Alpha")
+    m.root.add_child("Alphabet")
+    
+    assert m.find("ALPHA") is a
+    a.text = "Omega"
+    assert m.find("alpha") is None
+    assert m.find("omega") is a
+    
+    assert [t.text for t in m.find_regex(r"^alpha")] == ["Alphabet"]
+    assert [t.text for t in m.find_regex(r"a$")] == ["Omega"]
+
+
 def test_task_status():
     t = Task(percentage=0)
     assert t.status == TaskStatus.NOT_STARTED
@@ -49,6 +69,13 @@ def test_task_status():
     
     t.percentage = 100
     assert t.status == TaskStatus.COMPLETE
+    
+    with pytest.raises(AttributeError):
+        t.status = TaskStatus.NOT_STARTED
+    assert t.status == TaskStatus.COMPLETE
+    
+    import copy
+    assert copy.deepcopy(t).status == TaskStatus.COMPLETE
 
 
 def test_task_priority():
@@ -57,6 +84,23 @@ def test_task_priority():
     assert t.priority.value == "1"
 
 
+def test_parse_task_dates():
+    from mmap_tools.reader import _parse_date
+    
+    assert _parse_date("2025-03-05T09:07:03") == datetime(2025, 3, 5, 9, 7, 3)
+    assert _parse_date("2025-03-05") == datetime(2025, 3, 5)
+    assert _parse_date("03/05/2025") == datetime(2025, 3, 5)
+    for bad in (
+        "2025-03x05T09:07:03",
+        "2025-03-05T09x07x03",
+        "2025-03-05T 9:07:03",
+        "+025-03-05",
+        "2025-02-30",
+        "",
+    ):
+        assert _parse_date(bad) is None, bad
+
+
 def test_walk():
     m = MindMap()
     m.root.text = "Root"
@@ -81,6 +125,25 @@ def test_remove_and_move():
     assert b.children[0].text == "C"
 
 
+def test_remove_identical_siblings():
+    m = MindMap()
+    m.root.text = "Root"
+    first = m.root.add_child("Same")
+    second = m.root.add_child("Same")
+    third = m.root.add_child("Same")
+    keep = m.root.add_child("Keep")
+    
+    second.remove()
+    assert m.root.children[0] is first
+    assert m.root.children[1] is third
+    
+    m.root.remove_many([first, keep, Topic(text="Stranger")])
+    assert m.root.children == [third]
+    assert m.root.children[0] is third
+    assert first.parent is None and keep.parent is None
+    assert m.topic_count == 2
+
+
 def test_tasks_filter():
     m = MindMap()
     m.root.text = "Root"
@@ -100,6 +163,20 @@ def test_tasks_filter():
     assert len(open_tasks) == 1
     assert open_tasks[0].text == "Open"
 
+    # Task edits after a query are reflected in the next one
+    open_task.task.percentage = 100
+    assert list(m.tasks(status=TaskStatus.NOT_STARTED)) == []
+    no_task.task = Task(percentage=10)
+    assert [t.text for t in m.tasks()] == ["Open", "Done", "No task"]
+    assert [t.text for t in m.tasks(status=TaskStatus.IN_PROGRESS)] == ["No task"]
+    
+    # Detaching a task, or attaching one that already exists, is seen too
+    shared = done_task.task
+    done_task.task = None
+    assert [t.text for t in m.tasks()] == ["Open", "No task"]
+    no_task.task = shared
+    assert [t.text for t in m.tasks(status=TaskStatus.COMPLETE)] == ["Open", "No task"]
+
 
 def test_write_and_read_roundtrip():
     """Create a map, write it, read it back, verify."""
@@ -107,7 +184,12 @@ def test_write_and_read_roundtrip():
     m.root.text = "Test Roundtrip"
     
     child = m.root.add_child("Task Item")
-    child.task = Task(percentage=50, priority=TaskPriority.HIGH)
+    child.task = Task(
+        percentage=50,
+        priority=TaskPriority.HIGH,
+        due_date=datetime(2025, 3, 5, 9, 7, 3, 500),
+        start_date=datetime(2025, 3, 1, tzinfo=timezone.utc),
+    )
     
     m.root.add_child("Plain Item")
     m.root.children[0].add_child("Nested")
@@ -123,11 +205,228 @@ def test_write_and_read_roundtrip():
         assert m2.topic_count == 4
         assert m2.find("Task Item").task.percentage == 50
         assert m2.find("Task Item").task.priority == TaskPriority.HIGH
+        assert m2.find("Task Item").task.due_date == datetime(2025, 3, 5, 9, 7, 3)
+        assert m2.find("Task Item").task.start_date == datetime(2025, 3, 1)
         assert m2.find("Nested") is not None
+        oids = [t.oid for t in m2.walk()]
+        assert len(set(oids)) == 4
+        assert all(uuid.UUID(oid).version == 4 and oid == oid.upper() for oid in oids)
     finally:
         path.unlink(missing_ok=True)
 
 
+def test_update_preserves_other_entries():
+    """Saving an existing map copies its other archive entries untouched."""
+    import zipfile
+    
+    m = MindMap()
+    m.root.text = "Original"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source.mmap"
+        dest = Path(tmp) / "dest.mmap"
+        mmap_tools.write(m, source)
+        with zipfile.ZipFile(source, "a") as zf:
+            zf.writestr("bin/preview.png", bytes(range(256)) * 8, zipfile.ZIP_STORED)
+            zf.writestr("xsd/ünïcode.xsd", "<schema/>" * 50, zipfile.ZIP_DEFLATED)
+    
+        m = mmap_tools.read(source)
+        m.root.add_child("Added")
+        mmap_tools.write(m, dest)
+    
+        with zipfile.ZipFile(source) as old, zipfile.ZipFile(dest) as new:
+            assert new.testzip() is None
+            assert new.namelist() == old.namelist()
+            for name in ("bin/preview.png", "xsd/ünïcode.xsd"):
+                assert new.read(name) == old.read(name)
+                assert new.getinfo(name).compress_type == old.getinfo(name).compress_type
+        assert mmap_tools.read(dest).find("Added") is not None
+
+
+def test_update_copies_encrypted_entry():
+    """ZipCrypto entries with a data descriptor keep their password check."""
+    import zipfile
+    import zlib
+    
+    def crc_step(crc, byte):
+        return zlib.crc32(bytes([byte]), crc ^ 0xFFFFFFFF) ^ 0xFFFFFFFF
+    
+    def zipcrypto(data, pwd, check_byte):
+        keys = [305419896, 591751049, 878082192]
+        
+        def update(byte):
+            keys[0] = crc_step(keys[0], byte)
+            keys[1] = ((keys[1] + (keys[0] & 0xFF)) * 134775813 + 1) & 0xFFFFFFFF
+            keys[2] = crc_step(keys[2], keys[1] >> 24)
+        
+        for byte in pwd:
+            update(byte)
+        out = bytearray()
+        for byte in bytes(11) + bytes([check_byte]) + data:
+            k = keys[2] | 2
+            out.append(byte ^ ((k * (k ^ 1)) >> 8) & 0xFF)
+            update(byte)
+        return bytes(out)
+    
+    m = MindMap()
+    m.root.text = "Locked"
+    secret = b"attached secret" * 20
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source.mmap"
+        dest = Path(tmp) / "dest.mmap"
+        mmap_tools.write(m, source)
+        
+        # zipfile can't encrypt, so store the ciphertext and then mark the
+        # entry as encrypted, with a data descriptor, in the central directory
+        info = zipfile.ZipInfo("secret.txt", (2024, 5, 6, 7, 8, 10))
+        hour, minute, second = info.date_time[3:]
+        check_byte = (hour << 11 | minute << 5 | second // 2) >> 8
+        with zipfile.ZipFile(source, "a") as zf:
+            zf.writestr(info, zipcrypto(secret, b"pw", check_byte))
+            info.flag_bits |= 0x09
+            info.CRC = zlib.crc32(secret)
+            info.file_size = len(secret)
+        assert zipfile.ZipFile(source).read("secret.txt", pwd=b"pw") == secret
+        
+        mmap_tools.write(mmap_tools.read(source), dest)
+        with zipfile.ZipFile(dest) as zf:
+            assert zf.read("secret.txt", pwd=b"pw") == secret
+
+
+def test_update_uses_the_onetopic_the_reader_loaded():
+    import zipfile
+    
+    ns = "http://schemas.mindjet.com/MindManager/Application/2003"
+    xml = (
+        f'<ap:Map xmlns:ap="{ns}">'
+        '<ap:StyleGroup><ap:OneTopic><ap:Topic OId="style">'
+        '<ap:Text PlainText="Style"/></ap:Topic></ap:OneTopic></ap:StyleGroup>'
+        '<ap:OneTopic><ap:Topic OId="main"><ap:Text PlainText="Main"/><ap:SubTopics>'
+        + "".join(
+            f'<ap:Topic OId="C{i}"><ap:Text PlainText="Child {i}"/></ap:Topic>'
+            for i in range(5)
+        )
+        + "</ap:SubTopics></ap:Topic></ap:OneTopic></ap:Map>"
+    )
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "source.mmap"
+        dest = Path(tmp) / "dest.mmap"
+        with zipfile.ZipFile(source, "w") as zf:
+            zf.writestr("Document.xml", xml)
+        
+        m = mmap_tools.read(source)
+        mmap_tools.write(m, dest)
+        
+        # Whichever OneTopic was read is the one rewritten; the other is kept
+        with zipfile.ZipFile(dest) as zf:
+            doc = zf.read("Document.xml").decode("utf-8")
+        assert doc.count('PlainText="Style"') == 1
+        assert doc.count('OId="C') == 5
+        assert mmap_tools.read(dest).root.text == m.root.text
+
+
+def test_save_in_place_keeps_backup():
+    m = MindMap()
+    m.root.text = "Version 1"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "map.mmap"
+        bak = Path(tmp) / "map.mmap.bak"
+        mmap_tools.write(m, path)
+        
+        for version in (2, 3):
+            m = mmap_tools.read(path)
+            m.root.text = f"Version {version}"
+            m.root.add_child(f"Added in {version}")
+            mmap_tools.write(m, path)
+            assert mmap_tools.read(path).root.text == f"Version {version}"
+            assert mmap_tools.read(bak).root.text == f"Version {version - 1}"
+
+
+def test_failed_write_keeps_existing_file():
+    import zipfile
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        broken = Path(tmp) / "broken.mmap"
+        dest = Path(tmp) / "dest.mmap"
+        with zipfile.ZipFile(broken, "w") as zf:
+            zf.writestr("Document.xml", "<Map/>")
+        mmap_tools.write(MindMap(), dest)
+        before = dest.read_bytes()
+        
+        m = MindMap()
+        m._source_path = str(broken)
+        try:
+            mmap_tools.write(m, dest, backup=False)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError for a map without OneTopic")
+        
+        assert dest.read_bytes() == before
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["broken.mmap", "dest.mmap"]
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="POSIX modes and symlinks")
+def test_write_keeps_mode_and_follows_symlink():
+    m = MindMap()
+    m.root.text = "Private"
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "private.mmap"
+        mmap_tools.write(m, path)
+        path.chmod(0o600)
+        
+        m = mmap_tools.read(path)
+        m.root.add_child("Secret")
+        mmap_tools.write(m, path, backup=False)
+        assert path.stat().st_mode & 0o777 == 0o600
+        
+        link = Path(tmp) / "link.mmap"
+        link.symlink_to(path)
+        m.root.add_child("Via link")
+        mmap_tools.write(m, link, backup=False)
+        assert link.is_symlink()
+        assert mmap_tools.read(path).find("Via link") is not None
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["link.mmap", "private.mmap"]
+
+
+def test_write_single_topic_map_escapes_text():
+    m = MindMap()
+    m.root.text = 'Fish & "chips" <today>\n\tthen tea'
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "single.mmap"
+        mmap_tools.write(m, path)
+        m2 = mmap_tools.read(path)
+    
+    assert m2.root.text == m.root.text
+    assert m2.root.children == []
+
+
+def test_write_compress_level():
+    m = MindMap()
+    m.root.text = "Levels"
+    m.root.add_child("Child " * 200)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        sizes = {}
+        for level in (0, 9):
+            path = Path(tmp) / f"level{level}.mmap"
+            mmap_tools.write(m, path, compress_level=level)
+            assert mmap_tools.read(path).root.children[0].text == "Child " * 200
+            sizes[level] = path.stat().st_size
+        assert sizes[9] < sizes[0]
+        
+        try:
+            mmap_tools.write(m, Path(tmp) / "bad.mmap", compress_level=10)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError for compress_level=10")
+
+
 def test_markdown_export():
     m = MindMap()
     m.root.text = "My Tasks"
@@ -161,3 +460,190 @@ def test_markdown_roundtrip():
     assert m2.find("Do thing") is not None
     assert m2.find("Do thing").task is not None
     assert m2.find("Do thing").task.priority == TaskPriority.MEDIUM
+
+
+def test_read_deeply_nested_map():
+    """Reading must not be bounded by the interpreter recursion limit."""
+    import sys
+    import zipfile
+    
+    ns = "http://schemas.mindjet.com/MindManager/Application/2003"
+    depth = 400
+    xml = (
+        f'<ap:Map xmlns:ap="{ns}"><ap:OneTopic>'
+        + "".join(
+            f'<ap:Topic OId="T{i}"><ap:Text PlainText="Level {i}"/><ap:SubTopics>'
+            for i in range(depth)
+        )
+        + '<ap:Topic OId="leaf"><ap:Text PlainText="Leaf"/></ap:Topic>'
+        + "</ap:SubTopics></ap:Topic>" * depth
+        + "</ap:OneTopic></ap:Map>"
+    )
+    
+    with tempfile.NamedTemporaryFile(suffix=".mmap", delete=False) as f:
+        path = Path(f.name)
+    
+    try:
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("Document.xml", xml)
+        
+        old_limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(250)
+        try:
+            m = mmap_tools.read(path)
+        finally:
+            sys.setrecursionlimit(old_limit)
+        
+        assert m.root.text == "Level 0"
+        leaf = m.root
+        while leaf.children:
+            leaf = leaf.children[0]
+        assert leaf.text == "Leaf"
+        assert leaf.parent.text == f"Level {depth - 1}"
+    finally:
+        path.unlink(missing_ok=True)
+
+
+def test_read_ignores_external_entities():
+    import zipfile
+    
+    ns = "http://schemas.mindjet.com/MindManager/Application/2003"
+    with tempfile.TemporaryDirectory() as tmp:
+        secret = Path(tmp) / "secret.txt"
+        secret.write_text("TOP SECRET")
+        xml = (
+            f'<!DOCTYPE ap:Map [<!ENTITY s SYSTEM "{secret.as_uri()}">]>'
+            f'<ap:Map xmlns:ap="{ns}"><ap:OneTopic><ap:Topic OId="a">'
+            '<ap:Text PlainText="Root"/><ap:NotesGroup><ap:Notes PlainText="n">'
+            "<ap:Html>before &s;</ap:Html></ap:Notes></ap:NotesGroup>"
+            "</ap:Topic></ap:OneTopic></ap:Map>"
+        )
+        path = Path(tmp) / "entity.mmap"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("Document.xml", xml)
+        
+        # The stdlib parser rejects the undefined entity; lxml drops it
+        try:
+            m = mmap_tools.read(path)
+        except SyntaxError:
+            return
+        assert "SECRET" not in m.root.note.html
+
+
+def test_depth_and_path_follow_moves():
+    m = MindMap()
+    m.root.text = "Root"
+    a = m.root.add_child("A")
+    b = m.root.add_child("B")
+    c = a.add_child("C")
+    d = c.add_child("D")
+    
+    assert d.depth == 3
+    
+    c.move_to(b.add_child("B1"))
+    assert c.depth == 3
+    assert d.depth == 4
+    assert d.path == ["Root", "B", "B1", "C", "D"]
+    
+    paths = dict((t.text, p) for t, p in m.root.walk_with_path())
+    assert paths["D"] == ("Root", "B", "B1", "C", "D")
+    assert [p for _, p in b.walk_with_path()][0] == ("Root", "B")
+    
+    c.remove()
+    assert c.depth == 0
+    assert d.depth == 1
+    
+    # Trees built by assigning fields directly report the same depths
+    e = Topic(text="E")
+    e.parent = a
+    a.children.append(e)
+    g = Topic(text="G")
+    f = Topic(text="F", children=[g])
+    g.parent = f
+    f.parent = e
+    e.children.append(f)
+    assert e.depth == 2
+    assert g.depth == 4
+
+
+def test_topic_count_tracks_edits():
+    m = MindMap()
+    m.root.text = "Root"
+    a = m.root.add_child("A")
+    assert m.topic_count == 2
+    
+    a.add_child("A1")
+    assert m.topic_count == 3
+    
+    b = m.root.add_child("B")
+    assert [t.text for t in m.walk()] == ["Root", "A", "A1", "B"]
+    
+    a.move_to(b)
+    assert [t.text for t in m.walk()] == ["Root", "B", "A", "A1"]
+    assert m.find_all("a1")[0].depth == 3
+    
+    b.remove()
+    assert m.topic_count == 1
+    
+    direct = Topic(text="Direct", parent=m.root)
+    m.root.children.append(direct)
+    assert m.topic_count == 2
+    
+    # Scans read the live tree, including in-place list edits
+    m.root.add_child("Another")
+    m.root.children.sort(key=lambda t: t.text, reverse=True)
+    assert [t.text for t in m.walk()] == ["Root", "Direct", "Another"]
+    assert m.find_all("direct") == [direct]
+
+
+def test_markdown_export_with_workers():
+    m = MindMap()
+    m.root.text = "Big"
+    for b in range(4):
+        branch = m.root.add_child(f"Branch {b}")
+        for i in range(300):
+            item = branch.add_child(f"Item {b}.{i}")
+            if i % 7 == 0:
+                item.task = Task(percentage=i % 100, priority=TaskPriority.LOW)
+    
+    sequential = mmap_tools.to_markdown(m, include_frontmatter=False)
+    parallel = mmap_tools.to_markdown(m, include_frontmatter=False, workers=2)
+    assert parallel == sequential
+
+
+def test_markdown_export_with_spawned_workers():
+    """Under spawn the whole map is pickled, including topic styles read from a file."""
+    import multiprocessing
+    import zipfile
+    
+    ns = "http://schemas.mindjet.com/MindManager/Application/2003"
+    shape = '<ap:SubTopicShape SubTopicShape="urn:mindjet:Oval"/>'
+    branches = "".join(
+        f'<ap:Topic OId="B{b}"><ap:Text PlainText="Branch {b}"/>{shape}<ap:SubTopics>'
+        + "".join(
+            f'<ap:Topic OId="T{b}.{i}"><ap:Text PlainText="Item {i}"/>{shape}</ap:Topic>'
+            for i in range(400)
+        )
+        + "</ap:SubTopics></ap:Topic>"
+        for b in range(3)
+    )
+    xml = (
+        f'<ap:Map xmlns:ap="{ns}"><ap:OneTopic><ap:Topic OId="R">'
+        f'<ap:Text PlainText="Root"/><ap:SubTopics>{branches}</ap:SubTopics>'
+        "</ap:Topic></ap:OneTopic></ap:Map>"
+    )
+    
+    start_method = multiprocessing.get_start_method()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "styled.mmap"
+        with zipfile.ZipFile(path, "w") as zf:
+            zf.writestr("Document.xml", xml)
+        m = mmap_tools.read(path)
+        
+        multiprocessing.set_start_method("spawn", force=True)
+        try:
+            parallel = mmap_tools.to_markdown(m, workers=2)
+        finally:
+            multiprocessing.set_start_method(start_method, force=True)
+    
+    assert parallel == mmap_tools.to_markdown(m)